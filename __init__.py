@@ -1,10 +1,15 @@
 from .chunked_audio_processor import ChunkedAudioProcessor
 from .video_generator import VideoGenerator
 from .main import TalkingBobsPipeline
+from .tts_scheduler import TTSScheduler, TokenBucket
+from .render_service import RenderService
 
 __all__ = [
     'ChunkedAudioProcessor',
     'VideoGenerator',
-    'TalkingBobsPipeline'
+    'TalkingBobsPipeline',
+    'TTSScheduler',
+    'TokenBucket',
+    'RenderService'
 ]
 
@@ -4,6 +4,9 @@ from scipy.interpolate import interp1d
 from typing import Dict, List, Tuple, Optional
 
 
+IDLE_ENERGY_FLOOR = 0.1
+
+
 class ChunkedAudioProcessor:
     
     def __init__(self, sample_rate: int = 44100, video_fps: int = 30, smoothing_alpha: float = 0.2):
@@ -49,6 +52,13 @@ class ChunkedAudioProcessor:
         
         return chunk
     
+    @staticmethod
+    def find_idle_spans(energy, floor: float = IDLE_ENERGY_FLOOR) -> List[Tuple[int, int]]:
+        # Run-length encode the frames clamped to the floor as [start, end) spans
+        idle = np.asarray(energy) <= floor
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], idle.astype(np.int8), [0]])))
+        return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+    
     def build_timeline(self, num_speakers: int = 5) -> Dict:
         if not self.chunks:
             raise ValueError("No chunks added. Add chunks before building timeline.")
@@ -90,6 +100,8 @@ class ChunkedAudioProcessor:
                 if chunk_start_frame < total_frames:
                     speaker_energies[speaker_id][chunk_start_frame] = rms[0] if len(rms) > 0 else 0.0
         
+        idle_spans = {}
+        
         for speaker_id in range(num_speakers):
             energy = speaker_energies[speaker_id]
             
@@ -103,15 +115,17 @@ class ChunkedAudioProcessor:
             else:
                 normalized = smoothed
             
-            normalized = np.maximum(normalized, 0.1)
+            normalized = np.maximum(normalized, IDLE_ENERGY_FLOOR)
             
             speaker_energies[speaker_id] = normalized.tolist()
+            idle_spans[speaker_id] = self.find_idle_spans(normalized)
         
         timeline = {
             'frame_times': frame_times.tolist(),
             'total_frames': total_frames,
             'total_duration': total_duration,
-            'speakers': speaker_energies
+            'speakers': speaker_energies,
+            'idle_spans': idle_spans
         }
         
         print(f"Built timeline: {total_frames} frames, {total_duration:.2f}s duration")
@@ -2,12 +2,14 @@ import os
 import sys
 import random
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from pydub import AudioSegment
+from cartesia import Cartesia
 
 from .normalvid import AudioProcessor
 from .chunked_audio_processor import ChunkedAudioProcessor
 from .video_generator import VideoGenerator
+from .tts_scheduler import TTSScheduler
 
 
 class TalkingBobsPipeline:
@@ -16,17 +18,35 @@ class TalkingBobsPipeline:
         self,
         sample_rate: int = 44100,
         video_fps: int = 30,
-        output_file: str = "talking_bobs.mp4"
+        output_file: str = "talking_bobs.mp4",
+        tts_scheduler: Optional[TTSScheduler] = None,
+        idle_tile_cache: bool = False,
+        idle_cycle_frames: int = 126
     ):
         self.sample_rate = sample_rate
         self.video_fps = video_fps
         self.output_file = os.path.join(os.getcwd(), output_file)
+        self.tts_scheduler = tts_scheduler or TTSScheduler()
+        self.idle_tile_cache = idle_tile_cache
+        self.idle_cycle_frames = idle_cycle_frames
+        self.client = None
+        self.voice_catalog = {}
+        
+    def warm_up(self) -> None:
+        # Create the TTS client and fetch the voice catalog once so that
+        # later conversations reuse them instead of reconnecting.
+        if self.client is None:
+            self.client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
+        AudioProcessor.fetchVoices(self.client, self.voice_catalog, "masculine")
+        AudioProcessor.fetchVoices(self.client, self.voice_catalog, "feminine")
         
     def process_conversation(
         self,
         conversation: List[Tuple[int, str]],
-        temp_audio_dir: str = "public/temp_audio"
+        temp_audio_dir: str = "public/temp_audio",
+        output_file: Optional[str] = None
     ) -> str:
+        output_file = os.path.join(os.getcwd(), output_file) if output_file else self.output_file
         temp_audio_dir = os.path.join(os.getcwd(), temp_audio_dir)
         os.makedirs(temp_audio_dir, exist_ok=True)
         
@@ -40,7 +60,12 @@ class TalkingBobsPipeline:
         
         for speaker_id in range(num_speakers):
             script = {'script': []}
-            audio_processor = AudioProcessor(script, os.path.join(temp_audio_dir, f"speaker_{speaker_id}.wav"))
+            audio_processor = AudioProcessor(
+                script,
+                os.path.join(temp_audio_dir, f"speaker_{speaker_id}.wav"),
+                self.client,
+                self.voice_catalog
+            )
             
             if random.random() < 0.5:
                 audio_processor.setRandomMaleVoice()
@@ -50,23 +75,31 @@ class TalkingBobsPipeline:
             audio_processors[speaker_id] = audio_processor
             print(f"Speaker {speaker_id}: Voice ID = {audio_processor.voice.id}")
         
-        audio_chunk_files = []
-        
+        tts_jobs = []
         for turn_idx, (speaker_id, text) in enumerate(conversation):
             print(f"Turn {turn_idx + 1}/{len(conversation)}: Speaker {speaker_id} - \"{text[:50]}...\"")
             
             audio_processor = audio_processors[speaker_id]
-            
+            tts_jobs.append((
+                turn_idx,
+                lambda processor=audio_processor, text=text: b''.join(processor.generateAudioChunk(text)),
+                len(text)
+            ))
+        
+        wav_chunks = self.tts_scheduler.run(tts_jobs)
+        print(f"TTS stats for this conversation: {self.tts_scheduler.run_stats}")
+        
+        audio_chunk_files = []
+        
+        for turn_idx, (speaker_id, text) in enumerate(conversation):
             chunk_file_path = os.path.join(temp_audio_dir, f"chunk_{turn_idx:04d}.wav")
             
-            chunk_iter = audio_processor.generateAudioChunk(text)
             with open(chunk_file_path, 'wb') as f:
-                for chunk in chunk_iter:
-                    f.write(chunk)
+                f.write(wav_chunks[turn_idx])
             
             print(f"  Saved chunk to: {chunk_file_path}")
             
-            numpy_array = audio_processor.wav_bytes_to_numpy_from_file(chunk_file_path)
+            numpy_array = audio_processors[speaker_id].wav_bytes_to_numpy_from_file(chunk_file_path)
             
             audio_chunk_files.append({
                 'speaker_id': speaker_id,
@@ -98,14 +131,16 @@ class TalkingBobsPipeline:
         video_generator = VideoGenerator(
             timeline=timeline,
             audio_path=merged_audio_path,
-            video_fps=self.video_fps
+            video_fps=self.video_fps,
+            idle_tile_cache=self.idle_tile_cache,
+            idle_cycle_frames=self.idle_cycle_frames
         )
         
-        video_generator.render(self.output_file)
-        print(f"\n✅ Complete! Video saved: {self.output_file}")
+        video_generator.render(output_file)
+        print(f"\n✅ Complete! Video saved: {output_file}")
         print(f"Note: Audio files kept in {temp_audio_dir} for debugging")
         
-        return self.output_file
+        return output_file
     
     def _merge_audio_files(
         self,
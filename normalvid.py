@@ -13,21 +13,31 @@ SAMPLE_RATE = 44100
 
 class AudioProcessor:
 
-    def __init__(self, script: dict, output_file: str):
+    def __init__(self, script: dict, output_file: str, client: Cartesia = None, voice_catalog: dict = None):
         self.script = script
-        self.client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
+        self.client = client or Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
         self.output_file = output_file
         self.voice = None
+        self.voice_catalog = voice_catalog if voice_catalog is not None else {}
+    
+
+    @staticmethod
+    def fetchVoices(client, voice_catalog, gender):
+        if gender not in voice_catalog:
+            voice_catalog[gender] = list(client.voices.list(limit=20, gender=gender))
+        return voice_catalog[gender]
+    
+
+    def listVoices(self, gender):
+        return self.fetchVoices(self.client, self.voice_catalog, gender)
     
 
     def setRandomMaleVoice(self):
-        voices = list(self.client.voices.list(limit=20, gender="masculine"))
-        self.voice = random.choice(voices)
+        self.voice = random.choice(self.listVoices("masculine"))
     
 
     def setRandomFemaleVoice(self):
-        voices = list(self.client.voices.list(limit=20, gender="feminine"))
-        self.voice = random.choice(voices)
+        self.voice = random.choice(self.listVoices("feminine"))
 
     def generateAudioChunk(self, text):
         if self.voice is None:
@@ -0,0 +1,392 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import argparse
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from .main import TalkingBobsPipeline
+from .tts_scheduler import TTSScheduler
+
+
+_worker_pipeline: Optional[TalkingBobsPipeline] = None
+
+
+class OutputFileInUse(Exception):
+    pass
+
+
+def _init_worker(pipeline_options: Dict, scheduler_options: Dict) -> None:
+    # Network clients are not fork-safe, so each worker connects after it
+    # starts and then keeps the client and voice catalog for its lifetime.
+    global _worker_pipeline
+    _worker_pipeline = TalkingBobsPipeline(
+        tts_scheduler=TTSScheduler(**scheduler_options),
+        **pipeline_options
+    )
+    try:
+        _worker_pipeline.warm_up()
+    except Exception as e:
+        print(f"Worker {os.getpid()}: warm-up failed, will retry lazily: {e}")
+
+
+def _render_job(job: Dict) -> Dict:
+    start = time.monotonic()
+    try:
+        if _worker_pipeline.client is None:
+            _worker_pipeline.warm_up()
+        output_path = _worker_pipeline.process_conversation(
+            [tuple(turn) for turn in job['conversation']],
+            temp_audio_dir=job['temp_audio_dir'],
+            output_file=job['output_file']
+        )
+        return {
+            'status': 'done',
+            'output_path': output_path,
+            'render_seconds': time.monotonic() - start
+        }
+    except Exception as e:
+        return {
+            'status': 'failed',
+            'error': str(e),
+            'render_seconds': time.monotonic() - start
+        }
+
+
+class RenderService:
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        num_workers: int = 2,
+        sample_rate: int = 44100,
+        video_fps: int = 30,
+        requests_per_second: float = 2.0,
+        burst: int = 4,
+        idle_tile_cache: bool = False,
+        idle_cycle_frames: int = 126,
+        output_dir: str = "public/videos",
+        temp_audio_root: str = "public/temp_audio",
+        throughput_window: float = 300.0,
+        job_retention: float = 3600.0
+    ):
+        self.host = host
+        self.port = port
+        self.num_workers = num_workers
+        self.output_dir = os.path.abspath(output_dir)
+        self.temp_audio_root = os.path.abspath(temp_audio_root)
+        self.throughput_window = throughput_window
+        self.job_retention = job_retention
+
+        self.pipeline_options = {
+            'sample_rate': sample_rate,
+            'video_fps': video_fps,
+            'idle_tile_cache': idle_tile_cache,
+            'idle_cycle_frames': idle_cycle_frames
+        }
+        # Every worker has its own token bucket, so split the account's
+        # limit between them to keep the service as a whole within it.
+        self.scheduler_options = {
+            'requests_per_second': requests_per_second / num_workers,
+            'burst': max(1, burst // num_workers)
+        }
+
+        self.jobs: Dict[str, Dict] = {}
+        self.active_outputs: Dict[str, str] = {}
+        self.finished: deque = deque()
+        self.completions: deque = deque()
+        self.counts: Dict[str, int] = {'running': 0, 'done': 0, 'failed': 0}
+        self.pending: "queue.Queue[Dict]" = queue.Queue()
+        self.slots = threading.Semaphore(num_workers)
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+
+        self.pool = None
+        self.server = None
+        self.dispatcher = None
+        self.running = False
+
+    def _make_pool(self) -> ProcessPoolExecutor:
+        # Workers fork from a single-threaded server process that has the
+        # heavy modules preloaded, so they start warm and can be replaced
+        # safely after a crash even though this process runs threads.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([TalkingBobsPipeline.__module__])
+        pool = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.pipeline_options, self.scheduler_options)
+        )
+        # The executor only starts processes on demand; start them all now
+        # so the first jobs do not pay for worker start-up.
+        for _ in range(self.num_workers):
+            pool.submit(os.getpid)
+        return pool
+
+    def start(self) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.temp_audio_root, exist_ok=True)
+        self.pool = self._make_pool()
+
+        self.running = True
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatcher.start()
+
+        self.server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        print(f"Render service listening on http://{self.host}:{self.port} "
+              f"with {self.num_workers} workers")
+
+    def serve_forever(self) -> None:
+        if self.server is None:
+            self.start()
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self.running = False
+        if self.server is not None:
+            self.server.server_close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def resolve_output_path(self, output_file: Optional[str], job_id: str) -> str:
+        if output_file is None:
+            output_file = f"talking_bobs_{job_id}.mp4"
+        if (
+            not isinstance(output_file, str)
+            or os.path.basename(output_file) != output_file
+            or (os.path.altsep and os.path.altsep in output_file)
+            or output_file.startswith('.')
+            or not output_file.endswith('.mp4')
+            or output_file == '.mp4'
+        ):
+            raise ValueError("output_file must be a plain file name ending in .mp4")
+        return os.path.join(self.output_dir, output_file)
+
+    def submit(self, conversation: List, output_file: Optional[str] = None) -> str:
+        if not conversation:
+            raise ValueError("Conversation must contain at least one turn")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'conversation': conversation,
+            'output_file': self.resolve_output_path(output_file, job_id),
+            'temp_audio_dir': os.path.join(self.temp_audio_root, job_id),
+            'status': 'queued',
+            'submitted_at': time.time()
+        }
+
+        with self.lock:
+            # Two jobs rendering to the same name would clobber each other's
+            # intermediate and final files.
+            owner = self.active_outputs.get(job['output_file'])
+            if owner is not None:
+                raise OutputFileInUse(
+                    f"{os.path.basename(job['output_file'])} is in use by job {owner}"
+                )
+            self.active_outputs[job['output_file']] = job_id
+            self.jobs[job_id] = job
+            self._evict_finished(time.time())
+        self.pending.put(job)
+        return job_id
+
+    def _dispatch_loop(self) -> None:
+        while self.running:
+            # Only pull work once a worker is free, so jobs wait in the queue
+            # (and count towards queue_depth) rather than in the executor.
+            if not self.slots.acquire(timeout=0.5):
+                continue
+            try:
+                job = self.pending.get(timeout=0.5)
+            except queue.Empty:
+                self.slots.release()
+                continue
+            self._dispatch(job)
+
+    def _dispatch(self, job: Dict) -> None:
+        with self.lock:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            self.counts['running'] += 1
+
+        payload = {k: job[k] for k in ('job_id', 'conversation', 'output_file', 'temp_audio_dir')}
+        pool = self.pool
+        try:
+            future = pool.submit(_render_job, payload)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._finish_job(job, None, e, pool)
+            return
+        future.add_done_callback(
+            lambda future, job=job, pool=pool: self._on_job_done(job, future, pool)
+        )
+
+    def _on_job_done(self, job: Dict, future, pool: ProcessPoolExecutor) -> None:
+        if future.cancelled():
+            self._finish_job(job, None, RuntimeError("Service shut down"), pool)
+            return
+        error = future.exception()
+        self._finish_job(job, None if error else future.result(), error, pool)
+
+    def _finish_job(
+        self,
+        job: Dict,
+        result: Optional[Dict],
+        error: Optional[BaseException],
+        pool: ProcessPoolExecutor
+    ) -> None:
+        now = time.time()
+        if result is None:
+            result = {'status': 'failed', 'error': str(error or "Worker returned no result")}
+
+        with self.lock:
+            job.update(result)
+            job['finished_at'] = now
+            self.counts['running'] -= 1
+            self.counts[job['status']] += 1
+            self.finished.append((now, job['job_id']))
+            self.completions.append((
+                now,
+                job['status'],
+                now - job['submitted_at'],
+                job.get('render_seconds')
+            ))
+            if self.active_outputs.get(job['output_file']) == job['job_id']:
+                del self.active_outputs[job['output_file']]
+
+            # A crashed worker breaks the whole executor and fails every job
+            # in flight on it; replace it once, not once per failed job.
+            if isinstance(error, BrokenProcessPool) and self.running and self.pool is pool:
+                print(f"Render worker crashed ({error}); restarting worker pool")
+                self.pool = self._make_pool()
+                pool.shutdown(wait=False)
+
+        shutil.rmtree(job['temp_audio_dir'], ignore_errors=True)
+        self.slots.release()
+
+    def _evict_finished(self, now: float) -> None:
+        while self.finished and now - self.finished[0][0] > self.job_retention:
+            _, job_id = self.finished.popleft()
+            self.jobs.pop(job_id, None)
+        while self.completions and now - self.completions[0][0] > self.throughput_window:
+            self.completions.popleft()
+
+    def metrics(self) -> Dict:
+        now = time.time()
+        with self.lock:
+            self._evict_finished(now)
+            counts = dict(self.counts)
+            done = [c for c in self.completions if c[1] == 'done']
+
+        window = min(self.throughput_window, max(now - self.started_at, 1e-6))
+        latencies = [latency for _, _, latency, _ in done]
+        render_times = [render for _, _, _, render in done if render is not None]
+
+        return {
+            'queue_depth': self.pending.qsize(),
+            'running': counts['running'],
+            'done': counts['done'],
+            'failed': counts['failed'],
+            'workers': self.num_workers,
+            'throughput_jobs_per_min': len(done) / window * 60.0,
+            'avg_latency_seconds': sum(latencies) / len(latencies) if latencies else None,
+            'avg_render_seconds': sum(render_times) / len(render_times) if render_times else None,
+            'uptime_seconds': now - self.started_at
+        }
+
+    def job_status(self, job_id: str) -> Optional[Dict]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: v for k, v in job.items() if k not in ('conversation', 'temp_audio_dir')}
+
+
+def _make_handler(service: RenderService):
+
+    class RenderRequestHandler(BaseHTTPRequestHandler):
+
+        def _send_json(self, status: int, body: Dict) -> None:
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self._send_json(200, service.metrics())
+            elif self.path.startswith('/jobs/'):
+                status = service.job_status(self.path[len('/jobs/'):])
+                if status is None:
+                    self._send_json(404, {'error': 'Unknown job'})
+                else:
+                    self._send_json(200, status)
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                self._send_json(404, {'error': 'Not found'})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                conversation = [(int(speaker_id), str(text)) for speaker_id, text in body['conversation']]
+                job_id = service.submit(conversation, body.get('output_file'))
+            except OutputFileInUse as e:
+                self._send_json(409, {'error': str(e)})
+                return
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                self._send_json(400, {'error': f"Invalid job: {e}"})
+                return
+
+            self._send_json(202, {'job_id': job_id})
+
+        def log_message(self, format, *args):
+            pass
+
+    return RenderRequestHandler
+
+
+def serve(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Warm TalkingBobs render service")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--num-workers', type=int, default=2)
+    parser.add_argument('--sample-rate', type=int, default=44100)
+    parser.add_argument('--video-fps', type=int, default=30)
+    parser.add_argument('--requests-per-second', type=float, default=2.0,
+                        help="Account-wide TTS rate limit, split across workers")
+    parser.add_argument('--burst', type=int, default=4,
+                        help="Account-wide TTS burst, split across workers")
+    parser.add_argument('--idle-tile-cache', action='store_true')
+    parser.add_argument('--idle-cycle-frames', type=int, default=126)
+    parser.add_argument('--output-dir', default="public/videos")
+    parser.add_argument('--temp-audio-root', default="public/temp_audio")
+    parser.add_argument('--throughput-window', type=float, default=300.0)
+    parser.add_argument('--job-retention', type=float, default=3600.0)
+    args = parser.parse_args(argv)
+
+    service = RenderService(**vars(args))
+    service.serve_forever()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,48 @@
+import os
+import sys
+import importlib
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+chunked_audio_processor = importlib.import_module(f"{os.path.basename(ROOT)}.chunked_audio_processor")
+ChunkedAudioProcessor = chunked_audio_processor.ChunkedAudioProcessor
+IDLE_ENERGY_FLOOR = chunked_audio_processor.IDLE_ENERGY_FLOOR
+
+
+@pytest.mark.parametrize("energy, spans", [
+    ([0.1, 0.1, 0.1, 0.1], [(0, 4)]),
+    ([0.5, 0.8, 1.0], []),
+    ([], []),
+    ([0.1, 0.1, 0.5, 0.6], [(0, 2)]),
+    ([0.5, 0.6, 0.1, 0.1], [(2, 4)]),
+    ([0.1, 0.1, 0.5, 0.1, 1.0, 0.1, 0.1], [(0, 2), (3, 4), (5, 7)]),
+    ([0.5, 0.1, 0.5, 0.1, 0.5], [(1, 2), (3, 4)]),
+    ([0.1], [(0, 1)]),
+    ([0.10001, 0.1], [(1, 2)]),
+])
+def test_find_idle_spans(energy, spans):
+    assert ChunkedAudioProcessor.find_idle_spans(energy) == spans
+
+
+def test_timeline_idle_spans_match_clamped_frames():
+    sample_rate = 8000
+    processor = ChunkedAudioProcessor(sample_rate=sample_rate, video_fps=30)
+    t = np.arange(sample_rate) / sample_rate
+    tone = (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    processor.add_chunk(0, tone)
+    processor.add_chunk(1, tone)
+    timeline = processor.build_timeline(num_speakers=3)
+
+    for speaker_id in range(3):
+        energy = np.array(timeline['speakers'][speaker_id])
+        idle = np.zeros(timeline['total_frames'], dtype=bool)
+        for start, end in timeline['idle_spans'][speaker_id]:
+            idle[start:end] = True
+        np.testing.assert_array_equal(idle, energy <= IDLE_ENERGY_FLOOR)
+
+    assert timeline['idle_spans'][2] == [(0, timeline['total_frames'])]
@@ -0,0 +1,241 @@
+import os
+import sys
+import json
+import time
+import threading
+import importlib
+import urllib.error
+import urllib.request
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+render_service = importlib.import_module(f"{os.path.basename(ROOT)}.render_service")
+RenderService = render_service.RenderService
+OutputFileInUse = render_service.OutputFileInUse
+
+
+class FakePool:
+
+    def __init__(self):
+        self.submitted = []
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.submitted.append((args, future))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def service(tmp_path):
+    return RenderService(
+        num_workers=2,
+        output_dir=str(tmp_path / "videos"),
+        temp_audio_root=str(tmp_path / "temp_audio")
+    )
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.parametrize("name", ["../x.mp4", "a/b.mp4", ".mp4", "x.mov", "/etc/x.mp4", ".hidden.mp4", 5])
+def test_resolve_output_path_rejects_unsafe_names(service, name):
+    with pytest.raises(ValueError):
+        service.resolve_output_path(name, "job")
+
+
+def test_resolve_output_path_stays_in_output_dir(service):
+    assert service.resolve_output_path("clip.mp4", "job") == os.path.join(service.output_dir, "clip.mp4")
+    assert service.resolve_output_path(None, "abc") == os.path.join(service.output_dir, "talking_bobs_abc.mp4")
+
+
+def test_output_file_in_use_until_job_finishes(service):
+    service.running = True
+    first = service.submit([(0, "hi")], "clip.mp4")
+
+    with pytest.raises(OutputFileInUse):
+        service.submit([(1, "hello")], "clip.mp4")
+
+    job = service.pending.get_nowait()
+    service._finish_job(job, {'status': 'done', 'render_seconds': 0.1}, None, service.pool)
+
+    second = service.submit([(1, "hello")], "clip.mp4")
+    assert second != first
+
+
+def test_rate_limit_split_across_workers(tmp_path):
+    service = RenderService(
+        num_workers=4,
+        requests_per_second=8.0,
+        burst=8,
+        idle_tile_cache=True,
+        idle_cycle_frames=180,
+        output_dir=str(tmp_path)
+    )
+
+    assert service.scheduler_options == {'requests_per_second': 2.0, 'burst': 2}
+    assert service.pipeline_options['idle_tile_cache'] is True
+    assert service.pipeline_options['idle_cycle_frames'] == 180
+
+
+def test_dispatch_one_job_per_free_worker(service):
+    pool = FakePool()
+    service.pool = pool
+    service.running = True
+    for i in range(4):
+        service.submit([(0, f"turn {i}")])
+
+    dispatcher = threading.Thread(target=service._dispatch_loop, daemon=True)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: len(pool.submitted) == 2)
+        time.sleep(0.1)
+        assert len(pool.submitted) == 2
+        assert service.metrics()['queue_depth'] == 2
+        assert service.metrics()['running'] == 2
+
+        # A finished job is reported immediately and frees its worker
+        (payload,), future = pool.submitted[0]
+        future.set_result({'status': 'done', 'output_path': payload['output_file'], 'render_seconds': 0.1})
+        assert service.job_status(payload['job_id'])['status'] == 'done'
+        (other,), _ = pool.submitted[1]
+        assert service.job_status(other['job_id'])['status'] == 'running'
+        assert wait_for(lambda: len(pool.submitted) == 3)
+    finally:
+        service.running = False
+        dispatcher.join(timeout=2)
+
+
+def test_evict_finished_after_retention(service):
+    service.job_retention = 10.0
+    now = time.time()
+    service.jobs = {'old': {}, 'new': {}, 'queued': {}}
+    service.finished.extend([(now - 20.0, 'old'), (now - 5.0, 'new')])
+
+    service._evict_finished(now)
+
+    assert set(service.jobs) == {'new', 'queued'}
+    assert list(service.finished) == [(now - 5.0, 'new')]
+
+
+def test_broken_pool_replaced_once(service, monkeypatch):
+    old_pool = FakePool()
+    new_pools = []
+    monkeypatch.setattr(service, '_make_pool', lambda: new_pools.append(FakePool()) or new_pools[-1])
+    service.pool = old_pool
+    service.running = True
+
+    jobs = []
+    for i in range(2):
+        service.submit([(0, f"turn {i}")], f"clip{i}.mp4")
+        job = service.pending.get_nowait()
+        os.makedirs(job['temp_audio_dir'])
+        assert service.slots.acquire(blocking=False)
+        service._dispatch(job)
+        jobs.append(job)
+
+    error = BrokenProcessPool("worker died")
+    for (_, future) in old_pool.submitted:
+        future.set_exception(error)
+
+    assert len(new_pools) == 1
+    assert service.pool is new_pools[0]
+    assert old_pool.shut_down
+    for job in jobs:
+        assert job['status'] == 'failed'
+        assert not os.path.exists(job['temp_audio_dir'])
+    assert service.active_outputs == {}
+    assert service.metrics()['failed'] == 2
+    assert service.slots.acquire(blocking=False) and service.slots.acquire(blocking=False)
+
+
+@pytest.fixture
+def http_service(service):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), render_service._make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield service, f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body):
+    request = urllib.request.Request(f"{url}/jobs", data=body, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"5",
+    b"[]",
+    b"{}",
+    b'{"conversation": 5}',
+    b'{"conversation": []}',
+    b'{"conversation": [[0]]}',
+    b'{"conversation": [["zero", "hi"]]}',
+    b'{"conversation": [[0, "hi"]], "output_file": "../x.mp4"}',
+])
+def test_post_malformed_body_returns_400(http_service, body):
+    service, url = http_service
+
+    status, response = post(url, body)
+
+    assert status == 400
+    assert 'error' in response
+    assert service.pending.qsize() == 0
+
+
+def test_post_accepts_job_and_rejects_output_conflict(http_service):
+    service, url = http_service
+    body = json.dumps({'conversation': [[0, "hi"]], 'output_file': "clip.mp4"}).encode()
+
+    status, response = post(url, body)
+    assert status == 202
+    assert service.job_status(response['job_id'])['status'] == 'queued'
+
+    status, response = post(url, body)
+    assert status == 409
+
+
+def test_serve_passes_command_line_options(monkeypatch):
+    created = {}
+
+    class RecordingService:
+        def __init__(self, **options):
+            created.update(options)
+
+        def serve_forever(self):
+            pass
+
+    monkeypatch.setattr(render_service, 'RenderService', RecordingService)
+    render_service.serve([
+        '--num-workers', '3', '--requests-per-second', '6', '--idle-tile-cache',
+        '--idle-cycle-frames', '180', '--output-dir', 'out', '--job-retention', '60'
+    ])
+
+    assert created['num_workers'] == 3
+    assert created['requests_per_second'] == 6.0
+    assert created['idle_tile_cache'] is True
+    assert created['idle_cycle_frames'] == 180
+    assert created['output_dir'] == 'out'
+    assert created['job_retention'] == 60.0
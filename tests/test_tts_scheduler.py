@@ -0,0 +1,296 @@
+import os
+import sys
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tts_scheduler
+from tts_scheduler import TTSScheduler, TokenBucket
+
+
+class FakeApiError(Exception):
+    # Same shape as cartesia.core.api_error.ApiError
+    def __init__(self, status_code, headers, body):
+        super().__init__(f"status_code: {status_code}, body: {body}")
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+class FakeTTSServer:
+    """Local TTS stand-in. Per job id, the first `fail` attempts return
+    `status` (optionally with Retry-After) and the first `slow` attempts
+    sleep for `delay` seconds before answering."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.arrivals = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/tts"
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                job_id = params['id']
+
+                with fake.lock:
+                    attempt = fake.attempts.get(job_id, 0)
+                    fake.attempts[job_id] = attempt + 1
+                    fake.arrivals.append((job_id, attempt, time.monotonic()))
+
+                if attempt < int(params.get('fail', 0)):
+                    self.send_response(int(params.get('status', 429)))
+                    if 'retry_after' in params:
+                        self.send_header('Retry-After', params['retry_after'])
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if attempt < int(params.get('slow', 0)):
+                    time.sleep(float(params.get('delay', 0)))
+                else:
+                    time.sleep(float(params.get('base_delay', 0)))
+
+                body = f"audio-{job_id}".encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/wav')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def synthesize(self, job_id, text, **params):
+        query = '&'.join(f"{k}={v}" for k, v in {'id': job_id, **params}.items())
+        request = urllib.request.Request(
+            f"{self.url}?{query}",
+            data=json.dumps({'transcript': text}).encode(),
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            raise FakeApiError(e.code, dict(e.headers), e.read())
+
+    def job(self, index, text="hello there", **params):
+        return (index, lambda: self.synthesize(str(index), text, **params), len(text))
+
+    def attempt_times(self, job_id):
+        with self.lock:
+            return [t for jid, _, t in self.arrivals if jid == job_id]
+
+
+@pytest.fixture
+def server():
+    fake = FakeTTSServer()
+    fake.thread.start()
+    yield fake
+    fake.server.shutdown()
+    fake.server.server_close()
+
+
+def fast_scheduler(**kwargs):
+    options = dict(
+        requests_per_second=1000.0,
+        burst=100,
+        base_backoff=0.05,
+        max_backoff=1.0,
+        hedge_min_samples=1000
+    )
+    options.update(kwargs)
+    return TTSScheduler(**options)
+
+
+def test_retries_429_with_exponential_backoff(server, monkeypatch):
+    # Take the top of the jitter range so the backoff is deterministic
+    monkeypatch.setattr(tts_scheduler.random, 'uniform', lambda low, high: high)
+    scheduler = fast_scheduler(max_retries=5)
+
+    results = scheduler.run([server.job(0, fail=3, status=429)])
+
+    assert results == {0: b"audio-0"}
+    assert scheduler.stats['retries'] == 3
+    times = server.attempt_times('0')
+    assert len(times) == 4
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    for attempt, gap in enumerate(gaps):
+        assert gap >= 0.05 * (2 ** attempt) * 0.9
+
+
+def test_retry_after_header_is_honoured(server, monkeypatch):
+    monkeypatch.setattr(tts_scheduler.random, 'uniform', lambda low, high: 0.0)
+    scheduler = fast_scheduler()
+
+    results = scheduler.run([server.job(0, fail=1, status=429, retry_after=0.4)])
+
+    assert results == {0: b"audio-0"}
+    first, second = server.attempt_times('0')
+    assert second - first >= 0.35
+
+
+def test_gives_up_after_max_retries(server):
+    scheduler = fast_scheduler(max_retries=2, base_backoff=0.01)
+
+    with pytest.raises(RuntimeError, match="turn 0"):
+        scheduler.run([server.job(0, fail=10, status=503)])
+
+    assert server.attempts['0'] == 3
+
+
+def test_non_retryable_status_fails_fast(server):
+    scheduler = fast_scheduler(base_backoff=1.0)
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError) as excinfo:
+        scheduler.run([server.job(0, fail=1, status=400)])
+
+    assert time.monotonic() - start < 0.5
+    assert server.attempts['0'] == 1
+    assert excinfo.value.__cause__.status_code == 400
+    assert scheduler.stats['retries'] == 0
+
+
+def test_conflict_is_not_retried(server):
+    scheduler = fast_scheduler()
+
+    with pytest.raises(RuntimeError):
+        scheduler.run([server.job(0, fail=1, status=409)])
+
+    assert server.attempts['0'] == 1
+
+
+def test_hedge_fires_past_latency_percentile(server):
+    scheduler = fast_scheduler(hedge_min_samples=5, hedge_percentile=95.0, max_concurrency=1)
+    scheduler.run([server.job(i, base_delay=0.02) for i in range(5)])
+    assert scheduler.stats['hedges'] == 0
+
+    start = time.monotonic()
+    results = scheduler.run([server.job(10, slow=1, delay=2.0, base_delay=0.02)])
+    elapsed = time.monotonic() - start
+
+    assert results == {10: b"audio-10"}
+    assert scheduler.stats['hedges'] == 1
+    assert server.attempts['10'] == 2
+    assert elapsed < 1.0
+
+
+def test_hedge_threshold_scales_with_transcript_length(server):
+    scheduler = fast_scheduler(hedge_min_samples=5, max_concurrency=1)
+    scheduler.run([server.job(i, text="x" * 10, base_delay=0.02) for i in range(5)])
+
+    short = scheduler.hedge_threshold(10)
+    assert scheduler.hedge_threshold(100) == pytest.approx(short * 10)
+
+    # A long turn that is slow only in proportion to its length is not hedged
+    scheduler.run([server.job(20, text="x" * 100, base_delay=0.1)])
+    assert scheduler.stats['hedges'] == 0
+
+
+def test_latency_window_is_bounded(server):
+    scheduler = fast_scheduler(latency_window=4)
+    scheduler.run([server.job(i) for i in range(10)])
+
+    assert len(scheduler.latencies) == 4
+
+
+def test_token_bucket_enforces_rate(server):
+    scheduler = fast_scheduler(requests_per_second=20.0, burst=1, max_concurrency=4)
+
+    start = time.monotonic()
+    scheduler.run([server.job(i) for i in range(11)])
+    elapsed = time.monotonic() - start
+
+    # The first token is already in the bucket; ten more at 20/s take 0.5s
+    assert elapsed >= 0.45
+    assert scheduler.stats['requests'] == 11
+
+
+def test_token_bucket_allows_burst():
+    bucket = TokenBucket(rate=1.0, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+
+    assert time.monotonic() - start < 0.1
+
+
+def test_jobs_dispatched_in_index_order(server):
+    scheduler = fast_scheduler(max_concurrency=1)
+    indices = [7, 2, 9, 0, 5, 3]
+
+    results = scheduler.run([server.job(i) for i in indices])
+
+    assert sorted(results) == sorted(indices)
+    first_arrivals = [int(jid) for jid, attempt, _ in server.arrivals if attempt == 0]
+    assert first_arrivals == sorted(indices)
+
+
+def test_duplicate_indices_rejected():
+    scheduler = fast_scheduler()
+
+    with pytest.raises(ValueError):
+        scheduler.run([(0, lambda: b"a", 1), (0, lambda: b"b", 1)])
+
+
+def test_transport_errors_are_retryable():
+    httpx = pytest.importorskip("httpx")
+
+    request = httpx.Request("POST", "http://localhost/tts")
+    assert TTSScheduler.is_retryable(httpx.ConnectError("refused", request=request))
+    assert TTSScheduler.is_retryable(httpx.ReadTimeout("timed out", request=request))
+    assert TTSScheduler.is_retryable(ConnectionResetError())
+    assert not TTSScheduler.is_retryable(ValueError("bad input"))
+
+
+def test_hedge_clock_ignores_time_queued_in_pool():
+    scheduler = fast_scheduler(hedge_min_samples=5)
+    scheduler.latencies.extend([0.01] * 10)
+    assert scheduler.hedge_threshold(10) == pytest.approx(0.1)
+
+    # A loser still holding the only pool thread keeps the next attempt
+    # queued well past the threshold; that wait must not trigger a hedge.
+    pool = tts_scheduler.ThreadPoolExecutor(max_workers=1)
+    pool.submit(time.sleep, 0.5)
+    try:
+        result = scheduler._hedged_call(lambda: time.sleep(0.02) or b"audio", 10, pool)
+    finally:
+        pool.shutdown(wait=True)
+
+    assert result == b"audio"
+    assert scheduler.stats['hedges'] == 0
+
+
+def test_run_stats_reset_per_run(server):
+    scheduler = fast_scheduler(base_backoff=0.01)
+
+    scheduler.run([server.job(0, fail=2, status=429)])
+    assert scheduler.run_stats == {'requests': 3, 'retries': 2, 'hedges': 0}
+
+    scheduler.run([server.job(1)])
+    assert scheduler.run_stats == {'requests': 1, 'retries': 0, 'hedges': 0}
+    assert scheduler.stats['requests'] == 4
@@ -0,0 +1,115 @@
+import os
+import sys
+import importlib
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+video_generator = importlib.import_module(f"{os.path.basename(ROOT)}.video_generator")
+VideoGenerator = video_generator.VideoGenerator
+IDLE_ENERGY_FLOOR = video_generator.IDLE_ENERGY_FLOOR
+
+# Tiles are rasterized around a local centre, so float truncation of the
+# outline points can land a handful of edge pixels differently.
+PIXEL_BUDGET_PER_BOB = 6
+
+
+def make_generator(num_speakers=4, **kwargs):
+    timeline = {
+        'total_frames': 300,
+        'speakers': {i: [IDLE_ENERGY_FLOOR] * 300 for i in range(num_speakers)}
+    }
+    options = dict(width=320, height=240, base_radius=20, idle_tile_cache=True)
+    options.update(kwargs)
+    return VideoGenerator(timeline=timeline, audio_path="unused.wav", **options)
+
+
+def blank_frame(generator):
+    frame = np.zeros((generator.height, generator.width, 3), dtype=np.uint8)
+    frame[:] = generator.bg_color
+    return frame
+
+
+def reference_frame(generator, frame_idx):
+    frame = blank_frame(generator)
+    phases = generator.idle_phases(frame_idx % generator.idle_cycle_frames)
+    for speaker_id in range(generator.num_speakers):
+        generator.draw_bob(
+            frame, generator.positions[speaker_id], IDLE_ENERGY_FLOOR,
+            generator.colors[speaker_id], frame_idx, phases=phases
+        )
+    return frame
+
+
+def blitted_frame(generator, frame_idx):
+    frame = blank_frame(generator)
+    for speaker_id in range(generator.num_speakers):
+        generator.blit_idle_bob(frame, speaker_id, frame_idx)
+    return frame
+
+
+@pytest.mark.parametrize("frame_idx", [0, 1, 37, 125, 126, 251])
+def test_blit_matches_draw_bob_at_idle_phase(frame_idx):
+    generator = make_generator()
+
+    expected = reference_frame(generator, frame_idx)
+    actual = blitted_frame(generator, frame_idx)
+
+    differing = int((expected != actual).any(axis=-1).sum())
+    assert differing <= PIXEL_BUDGET_PER_BOB * generator.num_speakers
+
+
+@pytest.mark.parametrize("position", [(3, 4), (318, 237), (-10, 120), (160, 250)])
+def test_blit_clips_at_frame_edge(position):
+    generator = make_generator(num_speakers=1)
+    generator.positions = [position]
+
+    expected = reference_frame(generator, 5)
+    actual = blitted_frame(generator, 5)
+
+    assert (actual != generator.bg_color).any()
+    differing = int((expected != actual).any(axis=-1).sum())
+    assert differing <= PIXEL_BUDGET_PER_BOB
+
+
+def test_blit_fully_off_frame_is_noop():
+    generator = make_generator(num_speakers=1)
+    generator.positions = [(-500, -500)]
+
+    frame = blitted_frame(generator, 0)
+
+    assert (frame == generator.bg_color).all()
+
+
+def test_idle_cycle_is_periodic():
+    generator = make_generator()
+
+    np.testing.assert_array_equal(blitted_frame(generator, 3), blitted_frame(generator, 3 + generator.idle_cycle_frames))
+
+
+def test_idle_masks_shared_across_speakers():
+    generator = make_generator(num_speakers=20)
+    for speaker_id in range(20):
+        generator.blit_idle_bob(blank_frame(generator), speaker_id, 7)
+
+    assert list(generator._idle_outline_masks) == [7]
+    assert len(generator._idle_swatches) == 20
+
+
+@pytest.mark.parametrize("cycle_frames", [0, 10, video_generator.MIN_IDLE_CYCLE_FRAMES - 1])
+def test_idle_cycle_frames_validated(cycle_frames):
+    with pytest.raises(ValueError):
+        make_generator(idle_cycle_frames=cycle_frames)
+
+
+def test_idle_frame_masks_expand_spans():
+    generator = make_generator(num_speakers=2)
+    generator.timeline['idle_spans'] = {0: [(0, 2), (5, 7)], 1: []}
+
+    masks = generator._idle_frame_masks(8)
+
+    assert masks[0].tolist() == [True, True, False, False, False, True, True, False]
+    assert not masks[1].any()
@@ -0,0 +1,257 @@
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import httpx
+    TRANSPORT_ERRORS = (ConnectionError, TimeoutError, httpx.TransportError)
+except ImportError:
+    TRANSPORT_ERRORS = (ConnectionError, TimeoutError)
+
+
+RETRYABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        if capacity < 1:
+            raise ValueError("Token bucket capacity must be at least 1")
+
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.tokens: float = float(capacity)
+        self.last_refill: float = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait_time = (1.0 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class TTSScheduler:
+
+    def __init__(
+        self,
+        requests_per_second: float = 2.0,
+        burst: int = 4,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 16.0,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 8,
+        max_hedges: int = 1,
+        latency_window: int = 200
+    ):
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_concurrency: int = max_concurrency
+        self.max_retries: int = max_retries
+        self.base_backoff: float = base_backoff
+        self.max_backoff: float = max_backoff
+        self.hedge_percentile: float = hedge_percentile
+        self.hedge_min_samples: int = hedge_min_samples
+        self.max_hedges: int = max_hedges
+
+        # Seconds per transcript character, so long turns are not mistaken
+        # for tail latency just because they take longer to synthesize.
+        self.latencies: deque = deque(maxlen=latency_window)
+        # Lifetime totals, plus counts for the most recent run() only
+        self.stats: Dict[str, int] = {'requests': 0, 'retries': 0, 'hedges': 0}
+        self.run_stats: Dict[str, int] = dict.fromkeys(self.stats, 0)
+        self.lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+            self.run_stats[key] += 1
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        status_code = getattr(error, 'status_code', None)
+        if status_code is None:
+            status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+        return status_code
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        status_code = TTSScheduler._status_code(error)
+        if status_code is not None:
+            return status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, TRANSPORT_ERRORS)
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(error, 'headers', None)
+        if headers is None:
+            headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if not headers:
+            return None
+
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def hedge_threshold(self, size: int) -> Optional[float]:
+        with self.lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        rank = int(round(self.hedge_percentile / 100.0 * (len(ordered) - 1)))
+        return ordered[min(max(rank, 0), len(ordered) - 1)] * max(size, 1)
+
+    def _timed_call(self, fn: Callable[[], bytes], size: int, started: List[float]) -> bytes:
+        start = time.monotonic()
+        started.append(start)
+        result = fn()
+        latency = time.monotonic() - start
+        with self.lock:
+            self.latencies.append(latency / max(size, 1))
+        return result
+
+    def _submit(self, fn: Callable[[], bytes], size: int, pool: ThreadPoolExecutor):
+        # Wait for a token before submitting so throttling time never counts
+        # towards the observed latency or the hedge timer.
+        self.bucket.acquire()
+        self._count('requests')
+        started: List[float] = []
+        return pool.submit(self._timed_call, fn, size, started), started
+
+    def _hedged_call(self, fn: Callable[[], bytes], size: int, pool: ThreadPoolExecutor) -> bytes:
+        future, started = self._submit(fn, size, pool)
+        start_times = {future: started}
+        pending = {future}
+        hedges_sent = 0
+        last_error = None
+
+        while pending:
+            threshold = self.hedge_threshold(size)
+            can_hedge = threshold is not None and hedges_sent < self.max_hedges
+
+            # The hedge clock runs from when an attempt actually starts, so
+            # time spent queued behind busy pool threads never looks like
+            # tail latency. Until one starts, poll at the threshold.
+            timeout = None
+            if can_hedge:
+                running = [start_times[f][0] for f in pending if start_times[f]]
+                if running:
+                    timeout = max(0.0, min(running) + threshold - time.monotonic())
+                else:
+                    timeout = threshold
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                last_error = error
+
+            running = [start_times[f][0] for f in pending if start_times[f]]
+            if not done and can_hedge and running and time.monotonic() - min(running) >= threshold:
+                hedges_sent += 1
+                self._count('hedges')
+                print(f"  Hedging request after {threshold:.2f}s "
+                      f"(p{self.hedge_percentile:g} latency)")
+                future, started = self._submit(fn, size, pool)
+                start_times[future] = started
+                pending.add(future)
+
+        raise last_error
+
+    def _call_with_retries(self, fn: Callable[[], bytes], size: int, pool: ThreadPoolExecutor) -> bytes:
+        attempt = 0
+        while True:
+            try:
+                return self._hedged_call(fn, size, pool)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.backoff_delay(attempt)
+                retry_after = self.retry_after(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                attempt += 1
+                self._count('retries')
+                print(f"  Retryable TTS error ({e}); retry {attempt}/{self.max_retries} "
+                      f"in {delay:.2f}s")
+                time.sleep(delay)
+
+    def run(self, jobs: List[Tuple[int, Callable[[], bytes], int]]) -> Dict[int, bytes]:
+        # Jobs are (timeline_index, fn, transcript_length); lower indices are
+        # dispatched first so the start of the conversation is ready before
+        # its tail.
+        indices = [index for index, _, _ in jobs]
+        if len(set(indices)) != len(indices):
+            raise ValueError("TTS job indices must be unique")
+
+        with self.lock:
+            self.run_stats = dict.fromkeys(self.stats, 0)
+
+        queue = [(index, fn, size) for index, fn, size in jobs]
+        heapq.heapify(queue)
+        queue_lock = threading.Lock()
+        results: Dict[int, bytes] = {}
+        errors: List[Tuple[int, Exception]] = []
+
+        attempt_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * (self.max_hedges + 1)
+        )
+
+        def worker() -> None:
+            while True:
+                with queue_lock:
+                    if not queue or errors:
+                        return
+                    index, fn, size = heapq.heappop(queue)
+                try:
+                    results[index] = self._call_with_retries(fn, size, attempt_pool)
+                except Exception as e:
+                    with queue_lock:
+                        errors.append((index, e))
+                    return
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as workers:
+                for _ in range(min(self.max_concurrency, len(jobs))):
+                    workers.submit(worker)
+        finally:
+            attempt_pool.shutdown(wait=False)
+
+        if errors:
+            index, error = min(errors, key=lambda item: item[0])
+            raise RuntimeError(f"TTS request for turn {index} failed: {error}") from error
+
+        return results
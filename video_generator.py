@@ -4,6 +4,18 @@ import numpy as np
 from moviepy import VideoFileClip, AudioFileClip
 from typing import Dict, List, Tuple, Optional
 
+from .chunked_audio_processor import ChunkedAudioProcessor, IDLE_ENERGY_FLOOR
+
+
+WOBBLE_HARMONICS = (3, 5, 7)
+WOBBLE_AMPLITUDES = (0.1, 0.05, 0.03)
+WOBBLE_PHASE_RATES = (1.0, 1.3, 0.7)
+WOBBLE_PHASE_STEP = 0.1
+
+# Shortest idle loop in which the slowest harmonic still makes a full turn,
+# so rounding to whole turns per loop keeps every harmonic moving.
+MIN_IDLE_CYCLE_FRAMES = int(np.ceil(2 * np.pi / (WOBBLE_PHASE_STEP * min(WOBBLE_PHASE_RATES))))
+
 
 class VideoGenerator:
     
@@ -15,7 +27,9 @@ class VideoGenerator:
         width: int = 1920,
         height: int = 1080,
         base_radius: int = 80,
-        max_scale: float = 1.5
+        max_scale: float = 1.5,
+        idle_tile_cache: bool = False,
+        idle_cycle_frames: int = 126
     ):
         self.timeline = timeline
         self.audio_path = audio_path
@@ -24,6 +38,16 @@ class VideoGenerator:
         self.height = height
         self.base_radius = base_radius
         self.max_scale = max_scale
+        if idle_cycle_frames < MIN_IDLE_CYCLE_FRAMES:
+            raise ValueError(
+                f"idle_cycle_frames must be at least {MIN_IDLE_CYCLE_FRAMES}, got {idle_cycle_frames}"
+            )
+        self.idle_tile_cache = idle_tile_cache
+        self.idle_cycle_frames = idle_cycle_frames
+        self.idle_phase_cycles = self._idle_phase_cycles()
+        self._idle_outline_masks: Dict[int, np.ndarray] = {}
+        self._idle_inner_mask: Optional[np.ndarray] = None
+        self._idle_swatches: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
         
         self.num_speakers = len(timeline['speakers'])
         self.positions = self._calculate_positions()
@@ -63,6 +87,22 @@ class VideoGenerator:
         
         return colors
     
+    def _idle_phase_cycles(self) -> Tuple[int, ...]:
+        # Whole number of turns each wobble harmonic makes per idle cycle,
+        # rounded from its natural speed so the loop is seamless.
+        return tuple(
+            int(round(rate * WOBBLE_PHASE_STEP * self.idle_cycle_frames / (2 * np.pi)))
+            for rate in WOBBLE_PHASE_RATES
+        )
+    
+    def frame_phases(self, frame_idx: int) -> Tuple[float, ...]:
+        phase = frame_idx * WOBBLE_PHASE_STEP
+        return tuple(phase * rate for rate in WOBBLE_PHASE_RATES)
+    
+    def idle_phases(self, cycle_idx: int) -> Tuple[float, ...]:
+        t = 2 * np.pi * (cycle_idx % self.idle_cycle_frames) / self.idle_cycle_frames
+        return tuple(t * cycles for cycles in self.idle_phase_cycles)
+    
     def generate_fluid_outline(
         self,
         center_x: int,
@@ -70,16 +110,17 @@ class VideoGenerator:
         base_radius: float,
         energy: float,
         frame_idx: int,
-        num_points: int = 80
+        num_points: int = 80,
+        phases: Optional[Tuple[float, ...]] = None
     ) -> np.ndarray:
         angles = np.linspace(0, 2 * np.pi, num_points, endpoint=False)
         
-        phase = frame_idx * 0.1
+        if phases is None:
+            phases = self.frame_phases(frame_idx)
         
-        wobble = (
-            np.sin(angles * 3 + phase) * 0.1 +
-            np.sin(angles * 5 + phase * 1.3) * 0.05 +
-            np.sin(angles * 7 + phase * 0.7) * 0.03
+        wobble = sum(
+            np.sin(angles * harmonic + phase) * amplitude
+            for harmonic, amplitude, phase in zip(WOBBLE_HARMONICS, WOBBLE_AMPLITUDES, phases)
         )
         
         energy_scale = 1.0 + (energy - 0.1) * (self.max_scale - 1.0) / 0.9
@@ -98,12 +139,13 @@ class VideoGenerator:
         position: Tuple[int, int],
         energy: float,
         color: Tuple[int, int, int],
-        frame_idx: int
+        frame_idx: int,
+        phases: Optional[Tuple[float, ...]] = None
     ) -> None:
         center_x, center_y = position
         
         outline_points = self.generate_fluid_outline(
-            center_x, center_y, self.base_radius, energy, frame_idx
+            center_x, center_y, self.base_radius, energy, frame_idx, phases=phases
         )
         
         cv2.fillPoly(frame, [outline_points], color)
@@ -117,6 +159,89 @@ class VideoGenerator:
             glow_color = tuple(min(255, c + 20) for c in color)
             cv2.circle(frame, (center_x, center_y), glow_radius, glow_color, 2)
     
+    def _idle_tile_half_size(self) -> int:
+        # Idle bobs are drawn at the energy floor, where the outline stays
+        # within base_radius * (1 + wobble) and the glow ring is never shown.
+        max_wobble = sum(WOBBLE_AMPLITUDES) * IDLE_ENERGY_FLOOR
+        return int(np.ceil(self.base_radius * (1.0 + max_wobble))) + 2
+    
+    def _get_idle_masks(self, cycle_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        # The idle shape is the same for every speaker, so the masks are
+        # shared and only the fill colour differs per speaker.
+        half = self._idle_tile_half_size()
+        side = 2 * half + 1
+        
+        if self._idle_inner_mask is None:
+            inner_mask = np.zeros((side, side), dtype=np.uint8)
+            inner_radius = int(self.base_radius * 0.7 * (1.0 + (IDLE_ENERGY_FLOOR - 0.1) * 0.5))
+            cv2.circle(inner_mask, (half, half), inner_radius, 255, -1)
+            self._idle_inner_mask = inner_mask
+        
+        if cycle_idx not in self._idle_outline_masks:
+            outline_points = self.generate_fluid_outline(
+                half, half, self.base_radius, IDLE_ENERGY_FLOOR, cycle_idx,
+                phases=self.idle_phases(cycle_idx)
+            )
+            outline_mask = np.zeros((side, side), dtype=np.uint8)
+            cv2.fillPoly(outline_mask, [outline_points], 255)
+            self._idle_outline_masks[cycle_idx] = outline_mask
+        
+        return self._idle_outline_masks[cycle_idx], self._idle_inner_mask
+    
+    def _get_idle_swatches(self, speaker_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Solid fills in the speaker's outline and inner colours; cv2.copyTo
+        # through a mask is far cheaper than boolean-index assignment.
+        if speaker_id not in self._idle_swatches:
+            side = 2 * self._idle_tile_half_size() + 1
+            color = self.colors[speaker_id]
+            inner_color = tuple(max(0, c - 30) for c in color)
+            self._idle_swatches[speaker_id] = (
+                np.full((side, side, 3), color, dtype=np.uint8),
+                np.full((side, side, 3), inner_color, dtype=np.uint8)
+            )
+        return self._idle_swatches[speaker_id]
+    
+    def blit_idle_bob(
+        self,
+        frame: np.ndarray,
+        speaker_id: int,
+        frame_idx: int
+    ) -> None:
+        outline_mask, inner_mask = self._get_idle_masks(frame_idx % self.idle_cycle_frames)
+        outline_fill, inner_fill = self._get_idle_swatches(speaker_id)
+        half = outline_mask.shape[0] // 2
+        center_x, center_y = self.positions[speaker_id]
+        
+        x0, y0 = center_x - half, center_y - half
+        x1, y1 = x0 + outline_mask.shape[1], y0 + outline_mask.shape[0]
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x1, frame.shape[1]), min(y1, frame.shape[0])
+        if fx0 >= fx1 or fy0 >= fy1:
+            return
+        
+        tile_rows = slice(fy0 - y0, fy1 - y0)
+        tile_cols = slice(fx0 - x0, fx1 - x0)
+        frame_roi = frame[fy0:fy1, fx0:fx1]
+        cv2.copyTo(outline_fill[tile_rows, tile_cols], outline_mask[tile_rows, tile_cols], frame_roi)
+        cv2.copyTo(inner_fill[tile_rows, tile_cols], inner_mask[tile_rows, tile_cols], frame_roi)
+    
+    def _idle_frame_masks(self, total_frames: int) -> Dict[int, np.ndarray]:
+        idle_spans = self.timeline.get('idle_spans')
+        idle_masks = {}
+        
+        for speaker_id in range(self.num_speakers):
+            if idle_spans is not None:
+                spans = idle_spans[speaker_id]
+            else:
+                spans = ChunkedAudioProcessor.find_idle_spans(self.timeline['speakers'][speaker_id])
+            
+            idle = np.zeros(total_frames, dtype=bool)
+            for start, end in spans:
+                idle[start:end] = True
+            idle_masks[speaker_id] = idle
+        
+        return idle_masks
+    
     def render(self, output_path: str) -> None:
         total_frames = self.timeline['total_frames']
         abs_output_path = os.path.join(os.getcwd(), output_path) if not os.path.isabs(output_path) else output_path
@@ -135,11 +260,19 @@ class VideoGenerator:
         if not video_writer.isOpened():
             raise RuntimeError(f"Failed to open video writer for {temp_video_path}")
         
+        idle_masks = self._idle_frame_masks(total_frames) if self.idle_tile_cache else None
+        
+        background = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        background[:] = self.bg_color
+        
         for frame_idx in range(total_frames):
-            frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-            frame[:] = self.bg_color
+            frame = background.copy()
             
             for speaker_id in range(self.num_speakers):
+                if idle_masks is not None and idle_masks[speaker_id][frame_idx]:
+                    self.blit_idle_bob(frame, speaker_id, frame_idx)
+                    continue
+                
                 energy = self.timeline['speakers'][speaker_id][frame_idx]
                 position = self.positions[speaker_id]
                 color = self.colors[speaker_id]